@@ -1,8 +1,33 @@
 import locale
-from typing import Optional, List, Tuple
+import time
+from enum import Enum
+from typing import Iterator, NamedTuple, Optional, List, Tuple
 import numpy as np
-from PySide6.QtCore import QObject, Signal, QByteArray
-from PySide6.QtMultimedia import QMediaDevices, QAudioFormat, QAudioDevice, QAudioSource, QAudioSink, QAudio
+from PySide6.QtCore import QIODevice, QObject, QThread, QTimer, Qt, Signal, Slot, QByteArray
+try:
+    from PySide6.QtMultimedia import QMediaDevices, QAudioFormat, QAudioDevice, QAudioSource, QAudioSink, QAudio
+    _multimedia_error: Optional[ImportError] = None
+except ImportError as e:
+    # Loading QtMultimedia loads the platform audio stack (libpulse on Linux).
+    # Offline rendering only needs the DSP chain, so only devices require it.
+    QMediaDevices = QAudioFormat = QAudioDevice = QAudioSource = QAudioSink = QAudio = None
+    _multimedia_error = e
+from . import kernels
+from .profiling import profiled
+from .dsp import (
+    AutomaticGainControl,
+    BiquadEq,
+    DriftEstimator,
+    LevelMeter,
+    LoudnessMeter,
+    OverlapSaveEq,
+    PeakLimiter,
+    PolyphaseResampler,
+    Reblocker,
+    RingBuffer,
+    channel_routing_matrix,
+    ensure_rows,
+)
 
 
 def _normalize_device_name(raw_name: str | bytes) -> str:
@@ -31,29 +56,1014 @@ def _normalize_device_name(raw_name: str | bytes) -> str:
     return raw_name
 
 
-class AudioManager(QObject):
-    rms_level_changed = Signal(float)
+class SampleFormat(Enum):
+    # Named after QAudioFormat.SampleFormat, so device formats map by name.
+    UInt8 = "UInt8"
+    Int16 = "Int16"
+    Int32 = "Int32"
+    Float = "Float"
+
+
+def _sample_format(audio_format) -> Optional[SampleFormat]:
+    return SampleFormat.__members__.get(audio_format.sampleFormat().name)
+
+
+class SampleCodec(NamedTuple):
+    dtype: type
+    decode_scale: float
+    encode_scale: float
+    offset: float
+
+
+SAMPLE_CODECS = {
+    SampleFormat.UInt8: SampleCodec(np.uint8, 1.0 / 128.0, 127.0, 128.0),
+    SampleFormat.Int16: SampleCodec(np.int16, 1.0 / 32768.0, 32767.0, 0.0),
+    SampleFormat.Int32: SampleCodec(np.int32, 1.0 / 2147483648.0, float(np.nextafter(np.float32(2**31), 0)), 0.0),
+    SampleFormat.Float: SampleCodec(np.float32, 1.0, 1.0, 0.0),
+}
+
+MIN_BUFFER_MS = 5.0
+MAX_BUFFER_MS = 200.0
+BUFFER_GROW_FACTOR = 1.5
+BUFFER_SHRINK_FACTOR = 0.75
+BUFFER_SHRINK_AFTER_S = 30.0
+
+# Drift correction alone keeps the ratio within 0.1% of unity, so nothing
+# near Nyquist can alias and the passband can reach almost all the way up.
+DRIFT_RESAMPLER_TAPS = 64
+DRIFT_RESAMPLER_ROLLOFF = 0.97
+
+STATS_WINDOW = 512
+
+EQ_FREQUENCIES = [31, 63, 125, 250, 500, 1000, 2000, 4000, 8000, 16000]
+
+EQ_ENGINES = {
+    "biquad": BiquadEq,
+    "fft": OverlapSaveEq,
+}
+
+
+def volume_to_gain(gain_percent: int, sensitivity: float) -> float:
+    if gain_percent == 0:
+        return 0.0
+    normalized = gain_percent / 50.0
+    sensitivity_factor = 0.3 + (sensitivity * 0.7)
+    
+    if normalized <= 1.0:
+        return (normalized ** 2) * sensitivity_factor
+    max_boost = 1.0 + (sensitivity * 3.0)
+    return sensitivity_factor + ((normalized - 1.0) * (max_boost - sensitivity_factor))
+
+
+class RingReader(QIODevice):
+    def __init__(self, ring: RingBuffer, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._ring = ring
+        self._frame_bytes = ring.channels * np.dtype(ring.dtype).itemsize
+        self._scratch = np.zeros((0, ring.channels), dtype=ring.dtype)
+        self.empty_reads = 0
+
+    def isSequential(self) -> bool:
+        return True
+
+    def bytesAvailable(self) -> int:
+        return self._ring.fill() * self._frame_bytes + super().bytesAvailable()
+
+    def readData(self, maxlen: int) -> bytes:
+        # Hand over only what is queued; the sink polls again on its own clock
+        # rather than being fed padding that would inflate latency.
+        frame_count = min(maxlen // self._frame_bytes, self._ring.fill())
+        if frame_count <= 0:
+            self.empty_reads += 1
+            return b""
+        self._scratch = ensure_rows(self._scratch, frame_count)
+        block = self._scratch[:frame_count]
+        self._ring.read(block)
+        return block.tobytes()
+
+    def writeData(self, data: bytes) -> int:
+        return -1
+
+
+class Stage:
+    name = "stage"
+
+    def __init__(self) -> None:
+        self.bypassed = False
+
+    def is_identity(self) -> bool:
+        return False
+
+    def absorb_gain(self, gain: float) -> bool:
+        return False
+
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class MeterStage(Stage):
+    def __init__(self, name: str, meter) -> None:
+        super().__init__()
+        self.name = name
+        self.meter = meter
+
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        self.meter.process(block)
+        return block
+
+
+class RoutingStage(Stage):
+    name = "routing"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._matrix: Optional[np.ndarray] = None
+        self._scaled: Optional[np.ndarray] = None
+        self._routed = np.zeros((0, 0), dtype=np.float32)
+
+    def set_matrix(self, matrix: Optional[np.ndarray]) -> None:
+        self._matrix = matrix
+        self._scaled = matrix
+        if matrix is not None:
+            self._routed = np.zeros((0, matrix.shape[1]), dtype=np.float32)
+
+    def is_identity(self) -> bool:
+        return self._matrix is None
+
+    def absorb_gain(self, gain: float) -> bool:
+        if self._matrix is None:
+            return False
+        self._scaled = self._matrix if gain == 1.0 else self._matrix * np.float32(gain)
+        return True
+
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        self._routed = ensure_rows(self._routed, len(block))
+        routed = self._routed[: len(block)]
+        np.matmul(block, self._scaled, out=routed)
+        return routed
+
+
+class GainStage(Stage):
+    name = "gain"
 
     def __init__(self) -> None:
         super().__init__()
+        self.gain = 1.0
+
+    def is_identity(self) -> bool:
+        return self.gain == 1.0
+
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        np.multiply(block, self.gain, out=out)
+        return out
+
+
+class EqStage(Stage):
+    name = "eq"
+
+    def __init__(self, eq) -> None:
+        super().__init__()
+        self.eq = eq
+
+    def is_identity(self) -> bool:
+        return self.eq.is_bypassed()
+
+    def absorb_gain(self, gain: float) -> bool:
+        if self.eq.is_bypassed():
+            return False
+        self.eq.set_output_gain(gain)
+        return True
+
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        try:
+            return self.eq.process(block, out=out)
+        except Exception as e:
+            print(f"[Audio] EQ error: {e}")
+            return block
+
+
+class ProcessorStage(Stage):
+    def __init__(self, name: str, processor) -> None:
+        super().__init__()
+        self.name = name
+        self.processor = processor
+
+    def is_identity(self) -> bool:
+        return self.processor is None
+
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        return self.processor.process(block, out)
+
+
+class ResampleStage(ProcessorStage):
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        return self.processor.process(block)
+
+
+class ClipStage(Stage):
+    name = "clip"
+
+    def __init__(self, limiter: Stage) -> None:
+        super().__init__()
+        self._limiter = limiter
+
+    def is_identity(self) -> bool:
+        # The limiter already holds the output under its ceiling.
+        return not self._limiter.bypassed
+
+    def process(self, block: np.ndarray, out: np.ndarray) -> np.ndarray:
+        np.clip(block, -1.0, 1.0, out=out)
+        return out
+
+
+class Pipeline:
+    # Stages run in order on float32 blocks. process(block, out) returns the
+    # array holding the result: out for in-place stages, the stage's own buffer
+    # when the frame or channel count changes. replan() drops bypassed and
+    # identity stages and folds the scalar gain into a neighbouring linear
+    # stage, so it is called whenever a stage's configuration changes.
+    def __init__(self, stages: List[Stage]) -> None:
+        self._stages = list(stages)
+        self._plan: List[Stage] = []
+        self._slots: List[int] = []
+        # Seconds spent per stage (indexed like names()) since the caller last
+        # cleared it; gain folded into another stage is timed with that stage.
+        self.timings = np.zeros(len(self._stages))
+        self.replan()
+
+    def names(self) -> List[str]:
+        return [stage.name for stage in self._stages]
+
+    def stage(self, name: str) -> Stage:
+        for stage in self._stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def set_bypassed(self, name: str, bypassed: bool) -> None:
+        self.stage(name).bypassed = bypassed
+        self.replan()
+
+    def planned(self) -> List[str]:
+        return [stage.name for stage in self._plan]
+
+    def replan(self) -> None:
+        plan: List[Stage] = []
+        pending: Optional[GainStage] = None
+        for stage in self._stages:
+            stage.absorb_gain(1.0)
+            if stage.bypassed or stage.is_identity():
+                continue
+            if isinstance(stage, GainStage):
+                if not (plan and plan[-1].absorb_gain(stage.gain)):
+                    pending = stage
+                continue
+            if pending is not None:
+                if not stage.absorb_gain(pending.gain):
+                    plan.append(pending)
+                pending = None
+            plan.append(stage)
+        if pending is not None:
+            plan.append(pending)
+        self._slots = [self._stages.index(stage) for stage in plan]
+        self._plan = plan
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        clock = time.perf_counter
+        timings = self.timings
+        for slot, stage in zip(self._slots, self._plan):
+            started = clock()
+            block = stage.process(block, block)
+            timings[slot] += clock() - started
+        return block
+
+
+class CallbackStats:
+    # Per-callback phase timings in a fixed ring of rows plus the worker's
+    # counters; recording writes into preallocated arrays only, snapshot()
+    # does the reduction on the caller's thread.
+    def __init__(self, phases: List[str], window: int = STATS_WINDOW) -> None:
+        self.phases = list(phases)
+        self._times = np.zeros((window, len(self.phases)))
+        self.row = np.zeros(len(self.phases))
+        self._callbacks = 0
+
+    def slot(self, name: str) -> int:
+        return self.phases.index(name)
+
+    def begin(self) -> np.ndarray:
+        self.row.fill(0.0)
+        return self.row
+
+    def commit(self) -> None:
+        self._times[self._callbacks % len(self._times)] = self.row
+        self._callbacks += 1
+
+    def reset(self) -> None:
+        self._times.fill(0.0)
+        self._callbacks = 0
+
+    def snapshot(self) -> dict:
+        count = min(self._callbacks, len(self._times))
+        times = self._times[:count].copy() * 1e6
+        phases = {}
+        for i, name in enumerate(self.phases):
+            column = times[:, i]
+            if count == 0 or not column.any():
+                continue
+            phases[name] = {
+                "mean_us": float(column.mean()),
+                "p99_us": float(np.percentile(column, 99)),
+                "max_us": float(column.max()),
+            }
+        return {"callbacks": self._callbacks, "window": count, "phases": phases}
+
+
+class AudioWorker(QObject):
+    def __init__(self, eq_frequencies: List[int], eq_engine: str = "biquad", output_mode: str = "push") -> None:
+        super().__init__()
+        self._output_mode = output_mode
+        self._ring_reader: Optional[RingReader] = None
         self._audio_source: Optional[QAudioSource] = None
         self._audio_sink: Optional[QAudioSink] = None
         self._input_device: Optional[QAudioDevice] = None
         self._output_device: Optional[QAudioDevice] = None
+        self._io_device_in = None
         self._io_device_out = None
-        self._gain: float = 1.0
-        self._volume_sensitivity: float = 0.5
         self._sample_rate = 44100
-        self._format = QAudioFormat()
+        self._output_sample_rate = 44100
+        self._resampler: Optional[PolyphaseResampler] = None
+        self._drift_compensation = True
+        self._drift: Optional[DriftEstimator] = None
+        self._format: Optional[QAudioFormat] = None
+        self._output_format: Optional[QAudioFormat] = None
         self._channels = 2
-        self._buffer_size = 4096
-        self._eq_frequencies = [31, 63, 125, 250, 500, 1000, 2000, 4000, 8000, 16000]
+        self._output_channels = 2
+        self._routing: Optional[np.ndarray] = None
+        self._routing_override: Optional[np.ndarray] = None
+        self._input_codec = SAMPLE_CODECS[SampleFormat.Int16]
+        self._output_codec = SAMPLE_CODECS[SampleFormat.Int16]
+        self._latency_target_ms = 50.0
+        self._adaptive_buffers = True
+        self._buffer_ms = self._latency_target_ms / 4
+        self._glitches = 0
+        self._clean_since = 0.0
+        self._retarget = False
+        self._glitch_floor_ms = 0.0
+        self._shrink_after_s = BUFFER_SHRINK_AFTER_S
+        self._shrunk = False
+        self._adapt_timer: Optional[QTimer] = None
+        self._sink_timer: Optional[QTimer] = None
+        self._frames_written = 0
+        self._partial_writes = 0
+        self._sink_underruns = 0
+        self._block_size = 512
+        self._reblocker: Optional[Reblocker] = None
+        self._ring_seconds = 0.5
+        self._ring: Optional[RingBuffer] = None
+        self._work = np.zeros((0, self._channels), dtype=np.float32)
+        self._pcm = np.zeros((0, self._output_channels), dtype=self._output_codec.dtype)
+        self._meter = LevelMeter(self._sample_rate, self._channels)
+        self._loudness = LoudnessMeter(self._output_sample_rate, self._output_channels)
+        self._limiter = PeakLimiter(self._output_sample_rate, self._output_channels)
+        self._agc = AutomaticGainControl(self._sample_rate, self._output_channels)
+        self._eq = EQ_ENGINES[eq_engine](eq_frequencies, self._sample_rate)
+        self._routing_stage = RoutingStage()
+        self._gain_stage = GainStage()
+        self._resample_stage = ResampleStage("resample", None)
+        limiter_stage = ProcessorStage("limiter", self._limiter)
+        agc_stage = ProcessorStage("agc", self._agc)
+        agc_stage.bypassed = True
+        self._pipeline = Pipeline([
+            MeterStage("meter", self._meter),
+            self._routing_stage,
+            self._gain_stage,
+            EqStage(self._eq),
+            agc_stage,
+            self._resample_stage,
+            limiter_stage,
+            ClipStage(limiter_stage),
+            MeterStage("loudness", self._loudness),
+        ])
+        self._stats = CallbackStats(
+            ["read", "decode"] + self._pipeline.names() + ["encode", "write", "callback"]
+        )
+        self._read_slot = self._stats.slot("read")
+        self._decode_slot = self._stats.slot("decode")
+        self._encode_slot = self._stats.slot("encode")
+        self._write_slot = self._stats.slot("write")
+        self._callback_slot = self._stats.slot("callback")
+        self._stage_slots = slice(self._decode_slot + 1, self._encode_slot)
+        self._callback_errors = 0
+        self._late_callbacks = 0
+        self._active = False
+        self.start_result = False
+
+    @Slot(object, object)
+    def start(self, input_device: QAudioDevice, output_device: QAudioDevice) -> None:
+        self.start_result = self._start(input_device, output_device)
+
+    def _start(self, input_device: QAudioDevice, output_device: QAudioDevice) -> bool:
+        try:
+            if (self._input_device == input_device and 
+                self._output_device == output_device and
+                self._audio_source is not None and
+                self._audio_source.state() != QAudio.StoppedState):
+                return True
+                
+            self.stop()
+            
+            self._input_device = input_device
+            self._output_device = output_device
+            
+            format = self._input_device.preferredFormat()
+            if _sample_format(format) is None:
+                test_format = QAudioFormat(format)
+                test_format.setSampleFormat(QAudioFormat.Int16)
+                if self._input_device.isFormatSupported(test_format):
+                    format = test_format
+            
+            self._format = format
+            self._channels = format.channelCount()
+            self._reset_buffer_controller()
+            self._reset_counters()
+            
+            output_format = QAudioFormat(format)
+            output_preferred = self._output_device.preferredFormat()
+            output_format.setChannelCount(output_preferred.channelCount())
+            if _sample_format(output_preferred) is not None:
+                output_format.setSampleFormat(output_preferred.sampleFormat())
+            output_format.setSampleRate(output_preferred.sampleRate())
+            if not self._output_device.isFormatSupported(output_format):
+                output_format.setSampleRate(format.sampleRate())
+            if not self._output_device.isFormatSupported(output_format):
+                output_format = QAudioFormat(format)
+            self._output_format = output_format
+            self.configure(
+                format.sampleRate(), self._channels, _sample_format(format),
+                output_format.sampleRate(), output_format.channelCount(), _sample_format(output_format),
+            )
+            self._drift = DriftEstimator(self._output_sample_rate) if self._drift_compensation else None
+            
+            if not self._open_devices():
+                return False
+            
+            print(
+                f"[Audio] Stream started: {self._channels} -> {self._output_channels} channels, "
+                f"{self._sample_rate} -> {self._output_sample_rate}Hz"
+            )
+            return True
+            
+        except Exception as e:
+            print("[Audio] Error starting stream:", e)
+            return False
+
+    def configure(
+        self,
+        sample_rate: int,
+        channels: int,
+        sample_format: SampleFormat = SampleFormat.Int16,
+        output_sample_rate: Optional[int] = None,
+        output_channels: Optional[int] = None,
+        output_sample_format: Optional[SampleFormat] = None,
+        resample: Optional[bool] = None,
+    ) -> None:
+        # Sets up the DSP chain, reblocker and ring for a format pair. _start
+        # calls it with the negotiated device formats; offline callers use it
+        # directly and feed process_block without any device.
+        self._channels = channels
+        self._output_channels = output_channels or channels
+        self._input_codec = SAMPLE_CODECS[sample_format]
+        self._output_codec = SAMPLE_CODECS[output_sample_format or sample_format]
+        
+        if sample_rate != self._sample_rate:
+            self._sample_rate = sample_rate
+            self._eq.set_sample_rate(sample_rate)
+        self._eq.reset()
+        self._meter.configure(self._sample_rate, self._channels)
+        
+        self._output_sample_rate = output_sample_rate or sample_rate
+        self._build_resampler(self._drift_compensation if resample is None else resample)
+        self._loudness.configure(self._output_sample_rate, self._output_channels)
+        self._limiter.configure(self._output_sample_rate, self._output_channels)
+        self._agc.configure(self._sample_rate, self._output_channels)
+        self._build_routing()
+        self._pipeline.replan()
+        
+        self._reblocker = Reblocker(self._block_size, self._channels, self._input_codec.dtype)
+        self._ring = RingBuffer(
+            max(4 * self._block_size, int(self._output_sample_rate * self._ring_seconds)),
+            self._output_channels,
+            self._output_codec.dtype,
+        )
+
+    def _build_routing(self) -> None:
+        matrix = self._routing_override
+        shape = (self._output_channels, self._channels)
+        if matrix is not None and matrix.shape != shape:
+            print(
+                f"[Audio] Routing matrix is {matrix.shape[0]}x{matrix.shape[1]}, "
+                f"stream needs {shape[0]}x{shape[1]}; using the default routing"
+            )
+            matrix = None
+        if matrix is None and self._output_channels != self._channels:
+            matrix = channel_routing_matrix(self._channels, self._output_channels)
+        self._routing = np.ascontiguousarray(matrix.T) if matrix is not None else None
+        self._routing_stage.set_matrix(self._routing)
+
+    def _build_resampler(self, resample: bool) -> None:
+        if self._output_sample_rate != self._sample_rate:
+            self._resampler = PolyphaseResampler(
+                self._sample_rate, self._output_sample_rate, self._output_channels
+            )
+        elif resample:
+            self._resampler = PolyphaseResampler(
+                self._sample_rate, self._output_sample_rate, self._output_channels,
+                taps=DRIFT_RESAMPLER_TAPS, rolloff=DRIFT_RESAMPLER_ROLLOFF,
+            )
+        else:
+            self._resampler = None
+        self._resample_stage.processor = self._resampler
+
+    def process_frames(self, frames: np.ndarray) -> Iterator[np.ndarray]:
+        # Offline path: reblock raw input frames and yield each processed block.
+        # Yielded arrays are scratch views, valid until the next iteration.
+        for block in self._reblocker.blocks(frames):
+            yield self.process_block(block)
+
+    def _open_devices(self) -> bool:
+        buffer_us = int(self._buffer_ms * 1000)
+        self._audio_source = QAudioSource(self._input_device, self._format, self)
+        self._audio_sink = QAudioSink(self._output_device, self._output_format, self)
+        
+        self._audio_source.setBufferSize(self._format.bytesForDuration(buffer_us))
+        self._audio_sink.setBufferSize(self._output_format.bytesForDuration(buffer_us))
+        self._audio_sink.stateChanged.connect(self._on_sink_state_changed)
+        
+        if self._output_mode == "pull":
+            self._ring_reader = RingReader(self._ring, self)
+            self._ring_reader.open(QIODevice.ReadOnly | QIODevice.Unbuffered)
+            self._audio_sink.start(self._ring_reader)
+        else:
+            self._io_device_out = self._audio_sink.start()
+            if self._io_device_out is None:
+                return False
+        self._io_device_in = self._audio_source.start()
+        if self._io_device_in is None:
+            return False
+        
+        self._io_device_in.readyRead.connect(self._process_audio)
+        self._active = True
+        self._glitches = 0
+        self._clean_since = time.monotonic()
+        
+        if self._adapt_timer is None:
+            self._adapt_timer = QTimer(self)
+            self._adapt_timer.timeout.connect(self._adapt_buffers)
+        self._adapt_timer.start(1000)
+        
+        if self._sink_timer is None:
+            self._sink_timer = QTimer(self)
+            self._sink_timer.setTimerType(Qt.PreciseTimer)
+            self._sink_timer.timeout.connect(self._write_to_sink)
+        if self._output_mode == "push":
+            self._sink_timer.start(max(1, int(self._buffer_ms / 4)))
+        return True
+
+    @Slot()
+    def stop(self) -> None:
+        self._active = False
+        if self._adapt_timer is not None:
+            self._adapt_timer.stop()
+        try:
+            self._close_devices()
+            self._reblocker = None
+            self._ring = None
+            self._meter.reset()
+                
+        except Exception as e:
+            print("[Audio] Error stopping stream:", e)
+
+    def _on_sink_state_changed(self, state) -> None:
+        if (self._active and self._audio_sink is not None and state == QAudio.IdleState and
+            self._audio_sink.error() == QAudio.UnderrunError):
+            self._glitches += 1
+            self._sink_underruns += 1
+
+    def _buffer_ceiling_ms(self) -> float:
+        # The latency target budgets the two device buffers; DSP latency
+        # (EQ, resampler, limiter) is fixed and comes on top of it.
+        return min(MAX_BUFFER_MS, max(MIN_BUFFER_MS, self._latency_target_ms / 2))
+
+    def _reset_buffer_controller(self) -> None:
+        self._buffer_ms = min(self._buffer_ceiling_ms(), max(MIN_BUFFER_MS, self._latency_target_ms / 4))
+        self._glitch_floor_ms = 0.0
+        self._shrink_after_s = BUFFER_SHRINK_AFTER_S
+        self._shrunk = False
+
+    def _adapt_buffers(self) -> None:
+        if not self._active or not self._adaptive_buffers:
+            return
+        
+        now = time.monotonic()
+        previous_ms = self._buffer_ms
+        if self._retarget:
+            self._retarget = False
+            self._reset_buffer_controller()
+            self._glitches = 0
+            self._clean_since = now
+        elif self._glitches:
+            self._glitches = 0
+            self._clean_since = now
+            ceiling = self._buffer_ceiling_ms()
+            if self._buffer_ms >= ceiling and self._glitch_floor_ms < self._buffer_ms:
+                print(f"[Audio] Glitching at the {self._latency_target_ms:.0f} ms latency target")
+            # Never shrink back to a size that glitched, and if a shrink is
+            # what caused it, wait twice as long before probing again.
+            self._glitch_floor_ms = self._buffer_ms
+            if self._shrunk:
+                self._shrink_after_s *= 2
+            self._buffer_ms = min(ceiling, self._buffer_ms * BUFFER_GROW_FACTOR)
+        elif now - self._clean_since >= self._shrink_after_s:
+            self._clean_since = now
+            shrunk_ms = max(MIN_BUFFER_MS, self._buffer_ms * BUFFER_SHRINK_FACTOR)
+            if shrunk_ms > self._glitch_floor_ms:
+                self._buffer_ms = shrunk_ms
+        
+        if abs(self._buffer_ms - previous_ms) < 0.5:
+            self._buffer_ms = previous_ms
+            return
+        
+        print(f"[Audio] Device buffers {previous_ms:.1f} ms -> {self._buffer_ms:.1f} ms")
+        self._shrunk = self._buffer_ms < previous_ms
+        # Queued audio and the reblocker carry over into the reopened devices;
+        # only the drift loop's fill target depends on the buffer size.
+        self._close_devices()
+        if self._drift is not None:
+            self._drift.retarget()
+        if not self._open_devices():
+            print("[Audio] Error reopening devices")
+            self.stop()
+
+    def _close_devices(self) -> None:
+        self._active = False
+        if self._sink_timer is not None:
+            self._sink_timer.stop()
+        # The devices are parented to the worker, so dropping the reference
+        # alone would keep every reopened pair alive until shutdown.
+        if self._audio_source:
+            self._audio_source.stop()
+            self._audio_source.deleteLater()
+            self._audio_source = None
+        if self._audio_sink:
+            self._audio_sink.stop()
+            self._audio_sink.deleteLater()
+            self._audio_sink = None
+        if self._ring_reader is not None:
+            self._ring_reader.close()
+            self._ring_reader.deleteLater()
+            self._ring_reader = None
+        self._io_device_in = None
+        self._io_device_out = None
+
+    @Slot(float)
+    def set_latency_target(self, latency_ms: float) -> None:
+        self._latency_target_ms = latency_ms
+        self._retarget = True
+
+    @Slot(bool)
+    def set_adaptive_buffers(self, enabled: bool) -> None:
+        self._adaptive_buffers = enabled
+
+    def get_latency_ms(self) -> float:
+        ring = self._ring
+        reblocker = self._reblocker
+        latency = 2 * self._buffer_ms
+        if ring is not None:
+            latency += 1000.0 * ring.fill() / self._output_sample_rate
+        if reblocker is not None:
+            latency += 1000.0 * reblocker.pending() / self._sample_rate
+        return latency + 1000.0 * self.get_processing_latency()
+
+    def get_processing_latency(self) -> float:
+        latency = 0.0
+        if hasattr(self._eq, "get_latency") and not self._eq.is_bypassed():
+            latency += self._eq.get_latency() / self._sample_rate
+        if self._resampler is not None:
+            latency += self._resampler.get_latency() / self._sample_rate
+        if not self._pipeline.stage("limiter").bypassed:
+            latency += self._limiter.get_latency() / self._output_sample_rate
+        return latency
+
+    @Slot(float)
+    def set_gain(self, gain: float) -> None:
+        self._gain_stage.gain = gain
+        self._pipeline.replan()
+
+    @Slot(list)
+    def set_eq_gains(self, gains: List[float]) -> None:
+        self._eq.set_gains(gains)
+        self._pipeline.replan()
+
+    @Slot(object)
+    def set_routing_matrix(self, matrix: Optional[List[List[float]]]) -> None:
+        # Rows are outputs, columns inputs; None restores the speaker routing.
+        self._routing_override = None if matrix is None else np.array(matrix, dtype=np.float32)
+        if self._ring is not None:
+            self._build_routing()
+            self._pipeline.replan()
+
+    def is_active(self) -> bool:
+        return self._active
+
+    def get_rms_level(self) -> float:
+        return self._meter.level_db
+
+    def get_channel_levels(self) -> List[float]:
+        return self._meter.channel_levels_db.tolist()
+
+    @Slot(float)
+    def set_meter_rate(self, rate_hz: float) -> None:
+        self._meter.set_rate(rate_hz)
+
+    def get_loudness(self) -> dict:
+        return self._loudness.snapshot()
+
+    @Slot()
+    def reset_loudness(self) -> None:
+        self._loudness.reset()
+
+    @profiled("audio")
+    def _process_audio(self) -> None:
+        try:
+            if self._io_device_in is None:
+                return
+            clock = time.perf_counter
+            started = clock()
+            data: QByteArray = self._io_device_in.readAll()
+            if data.isEmpty():
+                return
+            
+            if self._ring is None or self._reblocker is None:
+                return
+            
+            stats = self._stats
+            row = stats.begin()
+            self._pipeline.timings.fill(0.0)
+            row[self._read_slot] = clock() - started
+            
+            samples = np.frombuffer(data, dtype=self._input_codec.dtype)
+            frame_count = len(samples) // self._channels
+            frames = samples[: frame_count * self._channels].reshape(frame_count, self._channels)
+            
+            overruns = self._ring.overruns
+            for block in self._reblocker.blocks(frames):
+                self._ring.write(self.process_block(block))
+            writing = clock()
+            self._write_to_sink()
+            trimmed = self._trim_ring()
+            if self._ring_reader is not None and self._ring.fill() > 0:
+                # A sink that went idle on an empty read only resumes pulling
+                # once the device it reads from announces new data.
+                self._ring_reader.readyRead.emit()
+            row[self._write_slot] = clock() - writing
+            
+            if self._drift is not None and self._resampler is not None:
+                output_frames = frame_count * self._output_sample_rate // self._sample_rate
+                self._resampler.set_ratio(self._drift.update(self._queued_frames(), output_frames))
+            
+            elapsed = clock() - started
+            row[self._stage_slots] = self._pipeline.timings
+            row[self._callback_slot] = elapsed
+            stats.commit()
+            
+            late = elapsed > frame_count / self._sample_rate
+            if late:
+                self._late_callbacks += 1
+            if self._ring.overruns != overruns or trimmed or late:
+                self._glitches += 1
+                
+        except Exception as e:
+            self._callback_errors += 1
+            print(f"[Audio] Callback error: {e}")
+
+    def process_block(self, pcm_in: np.ndarray) -> np.ndarray:
+        channels = self._channels
+        output_channels = self._output_channels
+        frame_count = len(pcm_in)
+        
+        output_codec = self._output_codec
+        if (self._work.shape[1] != channels or self._pcm.shape[1] != output_channels or
+            self._pcm.dtype != output_codec.dtype):
+            self._work = np.zeros((0, channels), dtype=np.float32)
+            self._pcm = np.zeros((0, output_channels), dtype=output_codec.dtype)
+        self._work = ensure_rows(self._work, frame_count)
+        block = self._work[:frame_count]
+        
+        row = self._stats.row
+        started = time.perf_counter()
+        self._decode(pcm_in, block)
+        decoded = time.perf_counter()
+        row[self._decode_slot] += decoded - started
+        block = self._pipeline.process(block)
+        self._pcm = ensure_rows(self._pcm, len(block))
+        encoding = time.perf_counter()
+        pcm = self._encode(block, self._pcm[: len(block)])
+        row[self._encode_slot] += time.perf_counter() - encoding
+        return pcm
+
+    def _decode(self, raw: np.ndarray, block: np.ndarray) -> None:
+        codec = self._input_codec
+        np.copyto(block, raw, casting="unsafe")
+        if codec.offset:
+            block -= codec.offset
+        if codec.decode_scale != 1.0:
+            block *= codec.decode_scale
+
+    def _encode(self, block: np.ndarray, output_data: np.ndarray) -> np.ndarray:
+        codec = self._output_codec
+        if codec.dtype is np.float32:
+            return block
+        block *= codec.encode_scale
+        if codec.offset:
+            block += codec.offset
+        np.copyto(output_data, block, casting="unsafe")
+        return output_data
+
+    def _write_to_sink(self) -> None:
+        if self._io_device_out is None or self._audio_sink is None or self._ring is None:
+            return
+        
+        frame_bytes = self._output_format.bytesPerFrame()
+        free_frames = self._audio_sink.bytesFree() // frame_bytes
+        while free_frames > 0 and self._ring.fill() > 0:
+            block = self._ring.peek(free_frames)
+            written = self._io_device_out.write(block.tobytes())
+            if written <= 0:
+                break
+            frames_written = written // frame_bytes
+            self._ring.advance(frames_written)
+            self._frames_written += frames_written
+            free_frames -= frames_written
+            if written < block.nbytes:
+                self._partial_writes += 1
+                break
+
+    def _trim_ring(self) -> int:
+        # The ring is sized for bursts, not for latency: after a sink stall
+        # whatever piled up would otherwise stay queued for good. Anything
+        # past the share of the latency target the sink buffer leaves is
+        # dropped, oldest first.
+        budget_ms = self._latency_target_ms - self._buffer_ms
+        limit = max(2 * self._block_size, int(self._output_sample_rate * budget_ms / 1000))
+        excess = self._ring.fill() - limit
+        if excess <= 0:
+            return 0
+        return self._ring.discard(excess)
+
+    def _queued_frames(self) -> int:
+        queued = self._ring.fill() if self._ring is not None else 0
+        if self._audio_sink is not None:
+            frame_bytes = self._output_format.bytesPerFrame()
+            queued += (self._audio_sink.bufferSize() - self._audio_sink.bytesFree()) // frame_bytes
+        return queued
+
+    @Slot(bool)
+    def set_drift_compensation(self, enabled: bool) -> None:
+        if enabled == self._drift_compensation:
+            return
+        self._drift_compensation = enabled
+        if self._ring is None:
+            return
+        running = self._audio_source is not None
+        self._drift = DriftEstimator(self._output_sample_rate) if enabled and running else None
+        if self._output_sample_rate == self._sample_rate:
+            # The 1:1 resampler only exists for drift correction.
+            self._build_resampler(enabled)
+            self._pipeline.replan()
+        elif self._resampler is not None:
+            self._resampler.set_ratio(1.0)
+
+    @Slot(bool)
+    def set_limiter_enabled(self, enabled: bool) -> None:
+        self._set_stage_enabled("limiter", enabled)
+
+    def get_gain_reduction_db(self) -> float:
+        return 0.0 if self._pipeline.stage("limiter").bypassed else self._limiter.gain_reduction_db
+
+    @Slot(bool)
+    def set_agc_enabled(self, enabled: bool) -> None:
+        self._set_stage_enabled("agc", enabled)
+
+    @Slot(float)
+    def set_agc_target(self, target_db: float) -> None:
+        self._agc.target_db = target_db
+
+    def get_agc_gain_db(self) -> float:
+        return 0.0 if self._pipeline.stage("agc").bypassed else self._agc.gain_db
+
+    def get_pipeline_plan(self) -> List[str]:
+        return self._pipeline.planned()
+
+    def _set_stage_enabled(self, name: str, enabled: bool) -> None:
+        stage = self._pipeline.stage(name)
+        if enabled and stage.bypassed:
+            stage.processor.reset()
+        self._pipeline.set_bypassed(name, not enabled)
+
+    def get_drift_ppm(self) -> float:
+        return self._drift.ppm if self._drift is not None else 0.0
+
+    def _reset_counters(self) -> None:
+        self._stats.reset()
+        self._frames_written = 0
+        self._partial_writes = 0
+        self._sink_underruns = 0
+        self._late_callbacks = 0
+        self._callback_errors = 0
+
+    def get_sink_counters(self) -> dict:
+        ring = self._ring
+        ring_reader = self._ring_reader
+        return {
+            "frames_written": self._frames_written,
+            "frames_queued": ring.fill() if ring is not None else 0,
+            "dropped_frames": ring.dropped_frames if ring is not None else 0,
+            "ring_overruns": ring.overruns if ring is not None else 0,
+            "partial_writes": self._partial_writes,
+            "sink_underruns": self._sink_underruns,
+            "empty_reads": ring_reader.empty_reads if ring_reader is not None else 0,
+        }
+
+    def get_stats(self) -> dict:
+        ring = self._ring
+        ring_reader = self._ring_reader
+        stats = self._stats.snapshot()
+        stats["counters"] = {
+            "sink_underruns": self._sink_underruns,
+            "ring_underruns": ring.underruns if ring is not None else 0,
+            "ring_overruns": ring.overruns if ring is not None else 0,
+            "dropped_frames": ring.dropped_frames if ring is not None else 0,
+            "partial_writes": self._partial_writes,
+            "empty_reads": ring_reader.empty_reads if ring_reader is not None else 0,
+            "late_callbacks": self._late_callbacks,
+            "callback_errors": self._callback_errors,
+        }
+        return stats
+
+
+class AudioManager(QObject):
+    _start_requested = Signal(object, object)
+    _stop_requested = Signal()
+    _gain_changed = Signal(float)
+    _eq_gains_changed = Signal(list)
+    _routing_matrix_changed = Signal(object)
+    _latency_target_changed = Signal(float)
+    _adaptive_buffers_changed = Signal(bool)
+    _drift_compensation_changed = Signal(bool)
+    _meter_rate_changed = Signal(float)
+    _loudness_reset_requested = Signal()
+    _limiter_enabled_changed = Signal(bool)
+    _agc_enabled_changed = Signal(bool)
+    _agc_target_changed = Signal(float)
+
+    def __init__(self, eq_engine: str = "biquad", output_mode: str = "push", dsp_backend: str = "auto") -> None:
+        super().__init__()
+        if _multimedia_error is not None:
+            raise _multimedia_error
+        # Kernels are picked and compiled before any DSP object binds to them.
+        self._dsp_backend = kernels.set_backend(dsp_backend)
+        kernels.warm_up()
+        print(f"[Audio] DSP backend: {self._dsp_backend}")
+        self._gain: float = 1.0
+        self._volume_sensitivity: float = 0.5
+        self._eq_frequencies = list(EQ_FREQUENCIES)
         self._eq_gains: List[float] = [0.0] * len(self._eq_frequencies)
-        self._fft_freqs_cache = {}
+
+        self._thread = QThread()
+        self._thread.setObjectName("AudioWorker")
+        self._worker = AudioWorker(self._eq_frequencies, eq_engine, output_mode)
+        self._worker.moveToThread(self._thread)
+
+        self._start_requested.connect(self._worker.start, Qt.BlockingQueuedConnection)
+        self._stop_requested.connect(self._worker.stop, Qt.BlockingQueuedConnection)
+        self._gain_changed.connect(self._worker.set_gain)
+        self._eq_gains_changed.connect(self._worker.set_eq_gains)
+        self._routing_matrix_changed.connect(self._worker.set_routing_matrix)
+        self._latency_target_changed.connect(self._worker.set_latency_target)
+        self._adaptive_buffers_changed.connect(self._worker.set_adaptive_buffers)
+        self._drift_compensation_changed.connect(self._worker.set_drift_compensation)
+        self._meter_rate_changed.connect(self._worker.set_meter_rate)
+        self._loudness_reset_requested.connect(self._worker.reset_loudness)
+        self._limiter_enabled_changed.connect(self._worker.set_limiter_enabled)
+        self._agc_enabled_changed.connect(self._worker.set_agc_enabled)
+        self._agc_target_changed.connect(self._worker.set_agc_target)
+
+    def get_dsp_backend(self) -> str:
+        return self._dsp_backend
 
     def get_eq_frequencies(self) -> List[int]:
         return self._eq_frequencies.copy()
-
     def get_input_devices(self) -> List[Tuple[int, str]]:
         devices: List[Tuple[int, str]] = []
         try:
@@ -82,159 +1092,40 @@ class AudioManager(QObject):
             if device_id < 0 or device_id >= len(audio_devices):
                 return False
             
-            new_input_device = audio_devices[device_id]
+            input_device = audio_devices[device_id]
             
             if output_id is None:
-                new_output_device = QMediaDevices.defaultAudioOutput()
+                output_device = QMediaDevices.defaultAudioOutput()
             else:
                 output_devices = QMediaDevices.audioOutputs()
                 if output_id < 0 or output_id >= len(output_devices):
-                    new_output_device = QMediaDevices.defaultAudioOutput()
+                    output_device = QMediaDevices.defaultAudioOutput()
                 else:
-                    new_output_device = output_devices[output_id]
-            
-            if (self._input_device == new_input_device and 
-                self._output_device == new_output_device and
-                self._audio_source is not None and
-                self._audio_source.state() != QAudio.StoppedState):
-                return True
-                
-            self.stop_stream()
+                    output_device = output_devices[output_id]
             
-            self._input_device = new_input_device
-            self._output_device = new_output_device
+            if not self._thread.isRunning():
+                self._thread.start(QThread.TimeCriticalPriority)
             
-            format = self._input_device.preferredFormat()
-            if format.sampleFormat() != QAudioFormat.Int16:
-                test_format = QAudioFormat(format)
-                test_format.setSampleFormat(QAudioFormat.Int16)
-                if self._input_device.isFormatSupported(test_format):
-                    format = test_format
-            
-            self._format = format
-            self._channels = min(format.channelCount(), 2)
-            
-            new_sample_rate = format.sampleRate()
-            if new_sample_rate != self._sample_rate:
-                self._sample_rate = new_sample_rate
-                self._fft_freqs_cache.clear()
-            
-            self._audio_source = QAudioSource(self._input_device, format, self)
-            self._audio_sink = QAudioSink(self._output_device, format, self)
-            
-            self._audio_source.setBufferSize(self._buffer_size)
-            self._audio_sink.setBufferSize(self._buffer_size)
-            
-            self._io_device_out = self._audio_sink.start()
-            io_device_in = self._audio_source.start()
-            
-            io_device_in.readyRead.connect(lambda: self._process_audio(io_device_in))
-            
-            print(f"[Audio] Stream started: {self._channels} channels, {self._sample_rate}Hz")
-            return True
+            self._start_requested.emit(input_device, output_device)
+            return self._worker.start_result
             
         except Exception as e:
             print("[Audio] Error starting stream:", e)
             return False
 
     def stop_stream(self) -> None:
-        try:
-            if self._audio_source:
-                self._audio_source.stop()
-                self._audio_source = None
-                
-            if self._audio_sink:
-                self._audio_sink.stop()
-                self._audio_sink = None
-                
-            self._io_device_out = None
-                
-        except Exception as e:
-            print("[Audio] Error stopping stream:", e)
-
-    def _apply_eq(self, audio_data: np.ndarray) -> np.ndarray:
-        if all(g == 0.0 for g in self._eq_gains):
-            return audio_data
-        
-        try:
-            data_len = len(audio_data)
-            
-            if data_len not in self._fft_freqs_cache:
-                self._fft_freqs_cache[data_len] = np.fft.rfftfreq(data_len, 1.0 / self._sample_rate)
-            
-            freqs = self._fft_freqs_cache[data_len]
-            fft_data = np.fft.rfft(audio_data)
-            
-            for i, (center_freq, gain_db) in enumerate(zip(self._eq_frequencies, self._eq_gains)):
-                if gain_db == 0.0:
-                    continue
-                
-                q_factor = 1.414
-                bandwidth = center_freq / q_factor
-                lower = center_freq - bandwidth / 2
-                upper = center_freq + bandwidth / 2
-                
-                mask = (freqs >= lower) & (freqs <= upper)
-                gain_linear = 10 ** (gain_db / 20)
-                fft_data[mask] *= gain_linear
-            
-            return np.fft.irfft(fft_data, n=data_len)
-        except Exception as e:
-            print(f"[Audio] EQ error: {e}")
-            return audio_data
+        if self._thread.isRunning():
+            self._stop_requested.emit()
 
-    def _process_audio(self, io_device_in) -> None:
-        try:
-            data: QByteArray = io_device_in.readAll()
-            if data.isEmpty():
-                return
-                
-            audio_bytes = data.data()
-            audio_data = np.frombuffer(audio_bytes, dtype=np.int16)
-            audio_float = audio_data.astype(np.float32) / 32768.0
-            
-            if self._channels == 2:
-                left = audio_float[0::2]
-                right = audio_float[1::2]
-                mono = (left + right) / 2
-                rms = np.sqrt(np.mean(mono**2))
-            else:
-                rms = np.sqrt(np.mean(audio_float**2))
-            
-            db_level = 20 * np.log10(max(rms, 1e-10))
-            self.rms_level_changed.emit(db_level)
-            
-            audio_float *= self._gain
-            
-            if self._channels == 2:
-                left_eq = self._apply_eq(audio_float[0::2])
-                right_eq = self._apply_eq(audio_float[1::2])
-                audio_float[0::2] = left_eq
-                audio_float[1::2] = right_eq
-            else:
-                audio_float = self._apply_eq(audio_float)
-            
-            audio_float = np.clip(audio_float, -1.0, 1.0)
-            output_data = (audio_float * 32767).astype(np.int16)
-            
-            if self._io_device_out:
-                self._io_device_out.write(output_data.tobytes())
-                
-        except Exception as e:
-            print(f"[Audio] Callback error: {e}")
+    def shutdown(self) -> None:
+        self.stop_stream()
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
 
-    def set_gain(self, gain_percent: int) -> None:        
-        if gain_percent == 0:
-            self._gain = 0.0
-        else:
-            normalized = gain_percent / 50.0
-            sensitivity_factor = 0.3 + (self._volume_sensitivity * 0.7)
-            
-            if normalized <= 1.0:
-                self._gain = (normalized ** 2) * sensitivity_factor
-            else:
-                max_boost = 1.0 + (self._volume_sensitivity * 3.0)
-                self._gain = sensitivity_factor + ((normalized - 1.0) * (max_boost - sensitivity_factor))
+    def set_gain(self, gain_percent: int) -> None:
+        self._gain = volume_to_gain(gain_percent, self._volume_sensitivity)
+        self._gain_changed.emit(self._gain)
 
     def set_volume_sensitivity(self, sensitivity: float) -> None:
         self._volume_sensitivity = sensitivity
@@ -242,9 +1133,67 @@ class AudioManager(QObject):
     def set_eq_gains(self, gains: List[float]) -> None:
         if len(gains) == len(self._eq_gains):
             self._eq_gains = gains.copy()
+            self._eq_gains_changed.emit(self._eq_gains.copy())
+
+    def set_routing_matrix(self, matrix: Optional[List[List[float]]]) -> None:
+        self._routing_matrix_changed.emit(None if matrix is None else [list(row) for row in matrix])
+
+    def set_latency_target(self, latency_ms: float) -> None:
+        self._latency_target_changed.emit(float(latency_ms))
+
+    def set_adaptive_buffers(self, enabled: bool) -> None:
+        self._adaptive_buffers_changed.emit(enabled)
+
+    def get_latency_ms(self) -> float:
+        return self._worker.get_latency_ms()
+
+    def get_sink_counters(self) -> dict:
+        return self._worker.get_sink_counters()
+
+    def get_stats(self) -> dict:
+        return self._worker.get_stats()
+
+    def set_drift_compensation(self, enabled: bool) -> None:
+        self._drift_compensation_changed.emit(enabled)
+
+    def get_drift_ppm(self) -> float:
+        return self._worker.get_drift_ppm()
+
+    def set_limiter_enabled(self, enabled: bool) -> None:
+        self._limiter_enabled_changed.emit(enabled)
+
+    def get_gain_reduction_db(self) -> float:
+        return self._worker.get_gain_reduction_db()
+
+    def set_agc_enabled(self, enabled: bool) -> None:
+        self._agc_enabled_changed.emit(enabled)
+
+    def set_agc_target(self, target_db: float) -> None:
+        self._agc_target_changed.emit(float(target_db))
+
+    def get_agc_gain_db(self) -> float:
+        return self._worker.get_agc_gain_db()
 
     def is_active(self) -> bool:
-        return self._audio_source is not None and self._audio_source.state() == QAudio.ActiveState
+        return self._worker.is_active()
+
+    def get_rms_level(self) -> float:
+        return self._worker.get_rms_level()
+
+    def get_channel_levels(self) -> List[float]:
+        return self._worker.get_channel_levels()
+
+    def set_meter_rate(self, rate_hz: float) -> None:
+        self._meter_rate_changed.emit(float(rate_hz))
+
+    def get_loudness(self) -> dict:
+        return self._worker.get_loudness()
+
+    def reset_loudness(self) -> None:
+        self._loudness_reset_requested.emit()
 
     def __del__(self) -> None:
-        self.stop_stream()
+        try:
+            self.shutdown()
+        except RuntimeError:
+            pass
@@ -0,0 +1,79 @@
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+_kernels: Dict[str, Callable] = {}
+_backend = "numpy"
+
+
+def available_backends() -> List[str]:
+    return ["numpy", "numba"] if numba is not None else ["numpy"]
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_backend(name: str) -> str:
+    global _backend
+    if name == "auto":
+        name = "numba" if numba is not None else "numpy"
+    if name not in available_backends():
+        print(f"[Audio] DSP backend '{name}' unavailable, using numpy")
+        name = "numpy"
+    _backend = name
+    _kernels.clear()
+    if name == "numba":
+        _kernels["biquad_cascade"] = _compiled_biquad_cascade()
+    return name
+
+
+def kernel(name: str) -> Optional[Callable]:
+    return _kernels.get(name)
+
+
+def warm_up() -> None:
+    # Compile every signature the audio thread can hit before it starts, so the
+    # first callback never pays for JIT compilation.
+    cascade = kernel("biquad_cascade")
+    if cascade is None:
+        return
+    coefficients = np.zeros((1, 5))
+    coefficients[0, 0] = 1.0
+    for dtype in (np.float32, np.float64):
+        frames = np.zeros((4, 2), dtype=dtype)
+        state = np.zeros((2, 2), dtype=dtype)
+        cascade(frames, frames, coefficients, state, 1.0)
+
+
+def _compiled_biquad_cascade() -> Callable:
+    # Transposed direct form II, section by section; the state rows are the
+    # same (z1, z2) pairs the state-space engine in dsp.BiquadCascade carries,
+    # so either path can pick up the other's filter memory.
+    @numba.njit(cache=True, nogil=True)
+    def biquad_cascade(frames, out, coefficients, state, gain):
+        sections = coefficients.shape[0]
+        for c in range(frames.shape[1]):
+            for t in range(frames.shape[0]):
+                x = np.float64(frames[t, c])
+                for s in range(sections):
+                    b0 = coefficients[s, 0]
+                    b1 = coefficients[s, 1]
+                    b2 = coefficients[s, 2]
+                    a1 = coefficients[s, 3]
+                    a2 = coefficients[s, 4]
+                    z1 = np.float64(state[2 * s, c])
+                    z2 = np.float64(state[2 * s + 1, c])
+                    y = b0 * x + z1
+                    state[2 * s, c] = b1 * x - a1 * y + z2
+                    state[2 * s + 1, c] = b2 * x - a2 * y
+                    x = y
+                out[t, c] = x * gain
+
+    return biquad_cascade
@@ -0,0 +1,191 @@
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+PROFILE_ENV = "CDAUX_PROFILE"
+PROFILE_DIR_ENV = "CDAUX_PROFILE_DIR"
+SAMPLE_INTERVAL_S = 0.001
+TRACEMALLOC_FRAMES = 8
+TOP_ALLOCATIONS = 25
+TRACEBACK_FRAMES = 6
+
+
+class SamplingProfiler:
+    # Samples the Python stack of any thread currently inside a profiled
+    # section from a background thread, so the sections themselves only pay
+    # for a dict update and two clock reads per call. Stacks are folded into
+    # "section;outer;...;inner count" lines for flamegraph.pl / speedscope.
+    # tracemalloc is the expensive part (several times slower allocations),
+    # so trace_memory=False leaves only the sampler.
+    def __init__(self, output_dir: str, interval: float = SAMPLE_INTERVAL_S, trace_memory: bool = True) -> None:
+        self._output_dir = output_dir
+        self._interval = interval
+        self._trace_memory = trace_memory
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._active: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._calls: Counter = Counter()
+        self._seconds: Counter = Counter()
+        self._max_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="Profiler", daemon=True)
+
+    def start(self) -> None:
+        if self._trace_memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._thread.start()
+
+    def call(self, label: str, func: Callable, args: tuple, kwargs: dict):
+        thread_id = threading.get_ident()
+        outer = self._active.get(thread_id)
+        self._active[thread_id] = label
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if outer is None:
+                del self._active[thread_id]
+            else:
+                self._active[thread_id] = outer
+            with self._lock:
+                self._calls[label] += 1
+                self._seconds[label] += elapsed
+                if elapsed > self._max_seconds.get(label, 0.0):
+                    self._max_seconds[label] = elapsed
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopping.wait(self._interval):
+            active = list(self._active.items())
+            if not active:
+                continue
+            if self._baseline is None and tracemalloc.is_tracing():
+                # Taken once the first section runs, so import-time and
+                # start-up allocations drop out of the report.
+                self._baseline = tracemalloc.take_snapshot()
+            frames = sys._current_frames()
+            for thread_id, label in active:
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                self._stacks[self._collapse(label, frame)] += 1
+
+    def _collapse(self, label: str, frame) -> str:
+        names: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.append(label)
+        return ";".join(reversed(names))
+
+    def stop(self) -> None:
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._thread.join()
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if self._trace_memory:
+            tracemalloc.stop()
+
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started))
+        base = os.path.join(self._output_dir, f"cdaux-profile-{stamp}")
+        try:
+            os.makedirs(self._output_dir, exist_ok=True)
+            with open(base + ".collapsed", "w") as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(base + ".txt", "w") as f:
+                self._write_report(f, snapshot)
+        except OSError as e:
+            print(f"[Profile] Could not write profile: {e}")
+            return
+        print(f"[Profile] Wrote {base}.collapsed and {base}.txt")
+
+    def _write_report(self, f, snapshot: Optional[tracemalloc.Snapshot]) -> None:
+        f.write(f"Profiled for {time.time() - self._started:.1f}s, "
+                f"sampling every {1000 * self._interval:.1f} ms\n\n")
+        f.write(f"{'section':<16}{'calls':>10}{'total ms':>12}{'mean us':>10}{'max us':>10}{'samples':>10}\n")
+        samples = Counter()
+        for stack, count in self._stacks.items():
+            samples[stack.split(";", 1)[0]] += count
+        for label, calls in self._calls.most_common():
+            total = self._seconds[label]
+            f.write(
+                f"{label:<16}{calls:>10}{1000 * total:>12.1f}{1e6 * total / calls:>10.1f}"
+                f"{1e6 * self._max_seconds[label]:>10.1f}{samples[label]:>10}\n"
+            )
+
+        if snapshot is None:
+            return
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        snapshot = snapshot.filter_traces(ignored)
+        baseline = self._baseline.filter_traces(ignored) if self._baseline is not None else None
+        if baseline is None:
+            f.write("\nNo profiled section ran; allocations include start-up\n")
+            stats = snapshot.statistics("traceback")
+        else:
+            stats = [stat for stat in snapshot.compare_to(baseline, "traceback") if stat.size_diff > 0]
+            stats.sort(key=lambda stat: stat.size_diff, reverse=True)
+
+        f.write(f"\nTop {TOP_ALLOCATIONS} allocation sites still live at exit (growth since first section)\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            size = getattr(stat, "size_diff", stat.size)
+            count = getattr(stat, "count_diff", stat.count)
+            f.write(f"\n{size / 1024:.1f} KiB in {count} blocks\n")
+            for line in stat.traceback.format(limit=TRACEBACK_FRAMES, most_recent_first=True):
+                f.write(f"  {line}\n")
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def enable(output_dir: Optional[str] = None, trace_memory: bool = True) -> None:
+    # Must run before the profiled modules are imported: profiled() decides
+    # at decoration time, so a disabled build keeps the undecorated functions.
+    global _profiler
+    if _profiler is not None:
+        return
+    _profiler = SamplingProfiler(
+        output_dir or os.environ.get(PROFILE_DIR_ENV) or os.getcwd(), trace_memory=trace_memory
+    )
+    _profiler.start()
+    atexit.register(_profiler.stop)
+    print(f"[Profile] Profiling enabled{'' if trace_memory else ' (CPU only)'}")
+
+
+def stop() -> None:
+    if _profiler is not None:
+        _profiler.stop()
+
+
+def is_enabled() -> bool:
+    return _profiler is not None
+
+
+def profiled(label: str) -> Callable:
+    def decorate(func: Callable) -> Callable:
+        if _profiler is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return _profiler.call(label, func, args, kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+_mode = os.environ.get(PROFILE_ENV, "")
+if _mode not in ("", "0"):
+    enable(trace_memory=_mode != "cpu")
@@ -0,0 +1,101 @@
+import time
+import wave
+from typing import List, Optional
+
+import numpy as np
+
+from .audio import EQ_FREQUENCIES, SAMPLE_CODECS, AudioWorker, SampleFormat
+
+WAV_SAMPLE_FORMATS = {
+    1: SampleFormat.UInt8,
+    2: SampleFormat.Int16,
+    4: SampleFormat.Int32,
+}
+CHUNK_FRAMES = 65536
+
+
+def render_file(
+    input_path: str,
+    output_path: str,
+    eq_gains: Optional[List[float]] = None,
+    gain: float = 1.0,
+    eq_engine: str = "biquad",
+    output_sample_rate: Optional[int] = None,
+    output_channels: Optional[int] = None,
+    agc: bool = False,
+    limiter: bool = True,
+) -> bool:
+    # Streams a PCM WAV file through the same AudioWorker chain as the live
+    # path, without a QApplication or any device. The chain's processing
+    # latency is trimmed from the start and flushed out at the end, so the
+    # output lines up with the input sample for sample.
+    started = time.perf_counter()
+    try:
+        with wave.open(input_path, "rb") as source:
+            width = source.getsampwidth()
+            if width not in WAV_SAMPLE_FORMATS:
+                print(f"[Render] Unsupported sample width: {8 * width}-bit")
+                return False
+            sample_format = WAV_SAMPLE_FORMATS[width]
+            codec = SAMPLE_CODECS[sample_format]
+            sample_rate = source.getframerate()
+            channels = source.getnchannels()
+            input_frames = source.getnframes()
+
+            worker = AudioWorker(EQ_FREQUENCIES, eq_engine)
+            worker.configure(
+                sample_rate, channels, sample_format,
+                output_sample_rate, output_channels, sample_format,
+                resample=False,
+            )
+            worker.set_gain(gain)
+            if eq_gains is not None:
+                worker.set_eq_gains(eq_gains)
+            worker.set_agc_enabled(agc)
+            worker.set_limiter_enabled(limiter)
+
+            output_sample_rate = output_sample_rate or sample_rate
+            output_channels = output_channels or channels
+            skip = int(round(worker.get_processing_latency() * output_sample_rate))
+            expected = input_frames * output_sample_rate // sample_rate
+            written = 0
+
+            with wave.open(output_path, "wb") as sink:
+                sink.setnchannels(output_channels)
+                sink.setsampwidth(width)
+                sink.setframerate(output_sample_rate)
+
+                def emit(block: np.ndarray) -> None:
+                    nonlocal skip, written
+                    if skip:
+                        dropped = min(skip, len(block))
+                        block = block[dropped:]
+                        skip -= dropped
+                    block = block[: expected - written]
+                    if len(block):
+                        sink.writeframes(block.tobytes())
+                        written += len(block)
+
+                while True:
+                    data = source.readframes(CHUNK_FRAMES)
+                    if not data:
+                        break
+                    frames = np.frombuffer(data, dtype=codec.dtype).reshape(-1, channels)
+                    for block in worker.process_frames(frames):
+                        emit(block)
+
+                silence = np.full((CHUNK_FRAMES // 16, channels), codec.offset, dtype=codec.dtype)
+                while written < expected:
+                    for block in worker.process_frames(silence):
+                        emit(block)
+    except (OSError, EOFError, wave.Error) as e:
+        print(f"[Render] Failed: {e}")
+        return False
+
+    elapsed = time.perf_counter() - started
+    seconds = input_frames / sample_rate
+    print(
+        f"[Render] {input_path} -> {output_path}: {seconds:.1f}s of audio in {elapsed:.1f}s "
+        f"({seconds / max(elapsed, 1e-9):.0f}x realtime)"
+    )
+    return True
@@ -1,7 +1,7 @@
 import math
 import os
 import sys
-from typing import Optional
+from typing import Callable, Optional
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -19,6 +19,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QPainter, QPixmap, QTransform, QColor, QIcon
 from .audio import AudioManager
+from .profiling import profiled
 from .settings_dialog import SettingsDialog
 from .eq_dialog import EqDialog
 
@@ -32,6 +33,7 @@ class RotatingDisc(QWidget):
         self._disc_sensitivity = 0.5
         self._disc_inertia = 0.5
         self._disc_pixmap: Optional[QPixmap] = None
+        self._level_source: Optional[Callable[[], float]] = None
         self.timer = QTimer()
         self.timer.timeout.connect(self._update_rotation)
         self.timer.start(16)
@@ -59,6 +61,9 @@ class RotatingDisc(QWidget):
     def set_disc_inertia(self, inertia: float) -> None:
         self._disc_inertia = inertia
 
+    def set_level_source(self, source: Optional[Callable[[], float]]) -> None:
+        self._level_source = source
+
     def set_audio_level(self, db_level: float) -> None:
         if db_level < -60:
             self.target_speed = 0.0
@@ -66,7 +71,10 @@ class RotatingDisc(QWidget):
             normalized = min(1.0, max(0.0, (db_level + 60) / 60))
             self.target_speed = normalized * 60.0 * self._disc_sensitivity
 
+    @profiled("disc_update")
     def _update_rotation(self) -> None:
+        if self._level_source is not None:
+            self.set_audio_level(self._level_source())
         speed_diff = self.target_speed - self.current_speed
         smoothing = 0.005 + (0.48 * (1.0 - self._disc_inertia))
         self.current_speed += speed_diff * smoothing
@@ -75,6 +83,7 @@ class RotatingDisc(QWidget):
             self.rotation_angle -= 360
         self.update()
 
+    @profiled("disc_paint")
     def paintEvent(self, event) -> None:
         if not self._disc_pixmap:
             return
@@ -199,7 +208,7 @@ class ControlPanel(QWidget):
 
 
 class MainWindow(QMainWindow):
-    def __init__(self) -> None:
+    def __init__(self, output_mode: str = "push") -> None:
         super().__init__()
         from app import __app_name__, __version__
         self.setWindowTitle(f"{__app_name__} v{__version__}")
@@ -209,7 +218,7 @@ class MainWindow(QMainWindow):
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
         self._apply_dark_theme()
-        self.audio_manager = AudioManager()
+        self.audio_manager = AudioManager(output_mode=output_mode)
         self._tray_enabled = True
         self._tray_notification = True
         self._setup_ui()
@@ -252,7 +261,7 @@ class MainWindow(QMainWindow):
         self.activateWindow()
 
     def _quit_app(self) -> None:
-        self.audio_manager.stop_stream()
+        self.audio_manager.shutdown()
         if hasattr(self, "tray_icon"):
             self.tray_icon.hide()
             self.tray_icon.deleteLater()
@@ -285,7 +294,7 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.disc_widget)
 
     def _connect_signals(self) -> None:
-        self.audio_manager.rms_level_changed.connect(self.disc_widget.set_audio_level)
+        self.disc_widget.set_level_source(self.audio_manager.get_rms_level)
 
     def _load_and_apply_settings(self) -> None:
         try:
@@ -332,7 +341,7 @@ class MainWindow(QMainWindow):
                 )
             event.ignore()
         else:
-            self.audio_manager.stop_stream()
+            self.audio_manager.shutdown()
             if hasattr(self, "tray_icon"):
                 self.tray_icon.hide()
                 self.tray_icon.deleteLater()
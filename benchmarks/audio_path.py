@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import kernels
+from app.audio import EQ_FREQUENCIES, AudioWorker, SampleFormat
+from app.dsp import Reblocker
+
+FLAT = [0.0] * len(EQ_FREQUENCIES)
+LOUDNESS = [6.0, 4.0, 1.0, 0.0, -2.0, 0.0, 1.0, 3.0, 5.0, 4.0]
+VOCAL = [-6.0, -4.0, -2.0, 0.0, 2.0, 4.0, 3.0, 1.0, 0.0, -2.0]
+WARMUP_CALLBACKS = 20
+ALLOC_CALLBACKS = 200
+
+
+class Scenario(NamedTuple):
+    name: str
+    engine: str
+    callback_frames: int
+    channels: int
+    output_channels: int
+    sample_rate: int
+    output_sample_rate: int
+    eq_gains: List[float]
+    gain: float = 1.0
+    agc: bool = False
+    # None takes configure()'s default, the drift resampler a live stream runs.
+    resample: Optional[bool] = False
+
+
+SCENARIOS = [
+    Scenario("flat-2ch-10ms", "biquad", 480, 2, 2, 48000, 48000, FLAT),
+    Scenario("biquad-2ch-10ms", "biquad", 480, 2, 2, 48000, 48000, LOUDNESS, 1.6),
+    Scenario("biquad-2ch-1024", "biquad", 1024, 2, 2, 44100, 44100, VOCAL, 0.8),
+    Scenario("biquad-2ch-4096", "biquad", 4096, 2, 2, 44100, 44100, LOUDNESS, 2.5),
+    Scenario("biquad-8ch-10ms", "biquad", 480, 8, 8, 48000, 48000, LOUDNESS),
+    Scenario("biquad-2to6-resample", "biquad", 441, 2, 6, 44100, 48000, VOCAL, 1.2),
+    Scenario("biquad-2ch-agc", "biquad", 480, 2, 2, 48000, 48000, LOUDNESS, 1.0, True),
+    Scenario("fft-2ch-10ms", "fft", 480, 2, 2, 48000, 48000, LOUDNESS, 1.6),
+    Scenario("fft-8ch-1024", "fft", 1024, 8, 8, 48000, 48000, VOCAL),
+    Scenario("biquad-2ch-10ms-drift", "biquad", 480, 2, 2, 48000, 48000, LOUDNESS, 1.6, resample=None),
+    Scenario("biquad-8ch-10ms-drift", "biquad", 480, 8, 8, 48000, 48000, LOUDNESS, resample=None),
+    Scenario("fft-2ch-10ms-drift", "fft", 480, 2, 2, 48000, 48000, LOUDNESS, 1.6, resample=None),
+]
+
+
+def build(scenario: Scenario) -> AudioWorker:
+    worker = AudioWorker(EQ_FREQUENCIES, scenario.engine)
+    worker.configure(
+        scenario.sample_rate, scenario.channels, SampleFormat.Int16,
+        scenario.output_sample_rate, scenario.output_channels, SampleFormat.Int16,
+        resample=scenario.resample,
+    )
+    worker.set_gain(scenario.gain)
+    worker.set_eq_gains(scenario.eq_gains)
+    worker.set_agc_enabled(scenario.agc)
+    return worker
+
+
+def callbacks(scenario: Scenario, count: int) -> List[np.ndarray]:
+    # A few distinct buffers of programme-like material: pink-ish noise with a
+    # slow level swell, so the limiter and AGC see realistic activity.
+    rng = np.random.default_rng(0)
+    frames = scenario.callback_frames
+    buffers = []
+    for i in range(min(count, 16)):
+        noise = np.cumsum(rng.standard_normal((frames, scenario.channels)), axis=0)
+        noise -= noise.mean(axis=0)
+        noise /= max(float(np.abs(noise).max()), 1e-9)
+        level = 0.2 + 0.6 * (i % 8) / 7
+        buffers.append((noise * level * 32767).astype(np.int16))
+    return buffers
+
+
+def run(scenario: Scenario, seconds: float) -> dict:
+    worker = build(scenario)
+    reblocker = Reblocker(512, scenario.channels, np.int16)
+    count = max(1, int(seconds * scenario.sample_rate / scenario.callback_frames))
+    buffers = callbacks(scenario, count)
+
+    def callback(frames: np.ndarray) -> None:
+        for block in reblocker.blocks(frames):
+            worker.process_block(block)
+
+    for i in range(WARMUP_CALLBACKS):
+        callback(buffers[i % len(buffers)])
+
+    times = np.empty(count)
+    clock = time.perf_counter
+    for i in range(count):
+        started = clock()
+        callback(buffers[i % len(buffers)])
+        times[i] = clock() - started
+
+    # Allocation pass runs separately: tracemalloc distorts the timings.
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    peak_bytes = 0
+    for i in range(ALLOC_CALLBACKS):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        callback(buffers[i % len(buffers)])
+        peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1] - current)
+    retained = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")
+    tracemalloc.stop()
+
+    audio_seconds = count * scenario.callback_frames / scenario.sample_rate
+    p50, p99, p999 = np.percentile(times, [50, 99, 99.9]) * 1e6
+    budget_us = 1e6 * scenario.callback_frames / scenario.sample_rate
+    return {
+        "scenario": scenario.name,
+        "engine": scenario.engine,
+        "callback_frames": scenario.callback_frames,
+        "channels": [scenario.channels, scenario.output_channels],
+        "sample_rate": [scenario.sample_rate, scenario.output_sample_rate],
+        "resample": scenario.resample,
+        "pipeline": worker.get_pipeline_plan(),
+        "callbacks": count,
+        "realtime_factor": audio_seconds / float(times.sum()),
+        "budget_us": budget_us,
+        "p50_us": float(p50),
+        "p99_us": float(p99),
+        "p999_us": float(p999),
+        "max_us": float(times.max() * 1e6),
+        "peak_alloc_bytes_per_callback": int(peak_bytes),
+        "retained_bytes_per_callback": sum(stat.size_diff for stat in retained) / ALLOC_CALLBACKS,
+        "retained_objects_per_callback": sum(stat.count_diff for stat in retained) / ALLOC_CALLBACKS,
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "dsp_backend": kernels.get_backend(),
+    }
+
+
+def print_results(results: List[dict], baseline: Optional[dict]) -> None:
+    header = f"{'scenario':<24}{'x RT':>8}{'p50 us':>9}{'p99 us':>9}{'p99.9 us':>10}{'budget':>9}{'peak B':>9}{'ret B':>8}"
+    if baseline:
+        header += f"{'p99 vs base':>13}"
+    print(header)
+    base = {r["scenario"]: r for r in baseline["results"]} if baseline else {}
+    for r in results:
+        line = (
+            f"{r['scenario']:<24}{r['realtime_factor']:>8.1f}{r['p50_us']:>9.1f}{r['p99_us']:>9.1f}"
+            f"{r['p999_us']:>10.1f}{r['budget_us']:>9.0f}{r['peak_alloc_bytes_per_callback']:>9}"
+            f"{r['retained_bytes_per_callback']:>8.1f}"
+        )
+        if r["scenario"] in base:
+            line += f"{r['p99_us'] / base[r['scenario']]['p99_us']:>12.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the AudioWorker processing core.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="audio seconds per scenario")
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--backend", default="auto", help="DSP kernel backend (auto, numpy, numba)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    kernels.set_backend(args.backend)
+    kernels.warm_up()
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only]
+    results = [run(scenario, args.seconds) for scenario in scenarios]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio import EQ_FREQUENCIES
+from app.dsp import BiquadEq, OverlapSaveEq
+
+EQ_GAINS = [4.0, 2.0, 0.0, -3.0, 0.0, 0.0, 2.0, 5.0, 0.0, -6.0]
+SAMPLE_RATE = 48000
+SECONDS = 10.0
+
+
+def run(engine_cls, dtype, block_size: int, channels: int) -> float:
+    engine = engine_cls(EQ_FREQUENCIES, SAMPLE_RATE, dtype=dtype)
+    engine.set_gains(EQ_GAINS)
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal((block_size, channels)) * 0.1).astype(dtype)
+    out = np.empty_like(block)
+    blocks = int(SECONDS * SAMPLE_RATE / block_size)
+
+    for _ in range(10):
+        engine.process(block, out=out)
+
+    start = time.perf_counter()
+    for _ in range(blocks):
+        engine.process(block, out=out)
+    elapsed = time.perf_counter() - start
+    return (blocks * block_size / SAMPLE_RATE) / elapsed
+
+
+def main() -> None:
+    print(f"{'engine':<14}{'block':>7}{'ch':>4}{'float64 x RT':>15}{'float32 x RT':>15}{'speedup':>10}")
+    for engine_cls in (BiquadEq, OverlapSaveEq):
+        for block_size in (256, 1024, 4096):
+            for channels in (2, 8):
+                rt64 = run(engine_cls, np.float64, block_size, channels)
+                rt32 = run(engine_cls, np.float32, block_size, channels)
+                print(
+                    f"{engine_cls.__name__:<14}{block_size:>7}{channels:>4}"
+                    f"{rt64:>15.1f}{rt32:>15.1f}{rt32 / rt64:>9.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,79 @@
+import argparse
 import sys
-from PySide6.QtWidgets import QApplication
-from app.ui import MainWindow
+from typing import List, Tuple
+
 from app import __version__, __app_name__
 
+
+def parse_args(argv: List[str]) -> Tuple[argparse.Namespace, List[str]]:
+    parser = argparse.ArgumentParser(prog=__app_name__)
+    parser.add_argument("--render", nargs=2, metavar=("IN_WAV", "OUT_WAV"),
+                        help="process a WAV file through the DSP chain and exit")
+    parser.add_argument("--eq", nargs=10, type=float, metavar="DB",
+                        help="EQ band gains in dB, 31 Hz to 16 kHz")
+    parser.add_argument("--volume", type=int, metavar="PERCENT",
+                        help="volume slider position 0-100 (default: unity gain)")
+    parser.add_argument("--sensitivity", type=float, default=0.5,
+                        help="volume sensitivity 0-1, as in settings")
+    parser.add_argument("--engine", choices=["biquad", "fft"], default="biquad")
+    parser.add_argument("--rate", type=int, help="output sample rate")
+    parser.add_argument("--channels", type=int, help="output channel count")
+    parser.add_argument("--agc", action="store_true", help="enable automatic gain control")
+    parser.add_argument("--no-limiter", action="store_true", help="hard-clip instead of limiting")
+    parser.add_argument("--output-mode", choices=["push", "pull"], default="push",
+                        help="push: the audio callback writes to the output device; "
+                             "pull: the output device reads from the ring on its own clock")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="profile the audio callback and disc painting; reports are written "
+                             "to DIR (default: current directory) on exit. Same as CDAUX_PROFILE=1")
+    parser.add_argument("--profile-cpu-only", action="store_true",
+                        help="with --profile, skip tracemalloc (CDAUX_PROFILE=cpu)")
+    return parser.parse_known_args(argv)
+
+
+def render(args: argparse.Namespace) -> int:
+    from app.audio import volume_to_gain
+    from app.render import render_file
+
+    gain = 1.0 if args.volume is None else volume_to_gain(args.volume, args.sensitivity)
+    ok = render_file(
+        args.render[0], args.render[1],
+        eq_gains=args.eq,
+        gain=gain,
+        eq_engine=args.engine,
+        output_sample_rate=args.rate,
+        output_channels=args.channels,
+        agc=args.agc,
+        limiter=not args.no_limiter,
+    )
+    return 0 if ok else 1
+
+
 def main() -> None:
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv[1:])
+    if args.render:
+        sys.exit(render(args))
+
+    # Before the UI and audio modules are imported, so their hooks get wrapped.
+    from app import profiling
+    if args.profile is not None:
+        profiling.enable(args.profile or None, trace_memory=not args.profile_cpu_only)
+
+    from PySide6.QtWidgets import QApplication
+    from app.ui import MainWindow
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setQuitOnLastWindowClosed(False)
     app.setApplicationName(__app_name__)
     app.setApplicationVersion(__version__)
     app.setStyle("Fusion")
-    
-    window = MainWindow()
+
+    window = MainWindow(output_mode=args.output_mode)
     window.show()
-    
-    sys.exit(app.exec())
+
+    result = app.exec()
+    profiling.stop()
+    sys.exit(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+import tracemalloc
+import unittest
+from typing import Optional
+
+import numpy as np
+
+from app.audio import EQ_FREQUENCIES, AudioWorker, SampleFormat
+
+EQ_GAINS = [6.0, 4.0, 1.0, 0.0, -2.0, 0.0, 1.0, 3.0, 5.0, 4.0]
+BLOCK_FRAMES = 512
+WARMUP_BLOCKS = 200
+MEASURED_BLOCKS = 600
+# Room for the scalars and views made per call, but not for any block-sized
+# buffer: 512 stereo float32 frames alone are 4 KB.
+BLOCK_PEAK_BYTES = 4096
+
+
+class ProcessBlockAllocationTest(unittest.TestCase):
+    def _worker(self, engine: str, resample: Optional[bool]) -> AudioWorker:
+        worker = AudioWorker(EQ_FREQUENCIES, engine)
+        worker.configure(48000, 2, SampleFormat.Int16, resample=resample)
+        worker.set_gain(0.8)
+        worker.set_eq_gains(EQ_GAINS)
+        return worker
+
+    def _blocks(self) -> list:
+        rng = np.random.default_rng(0)
+        return [
+            (rng.standard_normal((BLOCK_FRAMES, 2)) * 6000).astype(np.int16)
+            for _ in range(8)
+        ]
+
+    def _cases(self) -> list:
+        # resample=None is what a stream gets: the drift resampler is in the path.
+        return [(engine, resample) for engine in ("biquad", "fft") for resample in (None, False)]
+
+    def test_steady_state_blocks_do_not_grow_memory(self) -> None:
+        for engine, resample in self._cases():
+            with self.subTest(engine=engine, resample=resample):
+                worker = self._worker(engine, resample)
+                blocks = self._blocks()
+                tracemalloc.start()
+                try:
+                    # Warm-up grows every scratch buffer to its steady-state size
+                    # and runs the FFT engine, meters and limiter through full hops.
+                    for i in range(WARMUP_BLOCKS):
+                        worker.process_block(blocks[i % len(blocks)])
+                    before = tracemalloc.get_traced_memory()[0]
+                    for i in range(MEASURED_BLOCKS):
+                        worker.process_block(blocks[i % len(blocks)])
+                    growth = tracemalloc.get_traced_memory()[0] - before
+                finally:
+                    tracemalloc.stop()
+                # Counters and published levels are replaced rather than kept,
+                # so a few scalar objects come and go between the two readings.
+                # Anything retained per block grows with the block count.
+                self.assertLess(growth, MEASURED_BLOCKS, f"{growth} bytes retained over {MEASURED_BLOCKS} blocks")
+
+    def test_steady_state_blocks_do_not_allocate_buffers(self) -> None:
+        for engine, resample in self._cases():
+            with self.subTest(engine=engine, resample=resample):
+                worker = self._worker(engine, resample)
+                blocks = self._blocks()
+                tracemalloc.start()
+                try:
+                    for i in range(WARMUP_BLOCKS):
+                        worker.process_block(blocks[i % len(blocks)])
+                    worst = 0
+                    for i in range(MEASURED_BLOCKS):
+                        tracemalloc.reset_peak()
+                        current = tracemalloc.get_traced_memory()[0]
+                        worker.process_block(blocks[i % len(blocks)])
+                        worst = max(worst, tracemalloc.get_traced_memory()[1] - current)
+                finally:
+                    tracemalloc.stop()
+                self.assertLess(worst, BLOCK_PEAK_BYTES, f"{worst} bytes allocated within one block")
+
+
+if __name__ == "__main__":
+    unittest.main()